@@ -0,0 +1,134 @@
+"""
+Result caching for sub-agent calls.
+
+Sub-agent responses are stored in SQLite, keyed by a hash of the chunk
+content. A lookup must match the chunk exactly; the task description is
+then matched exactly or, when an embedder is configured, by cosine
+similarity so that rephrased queries on the same chunk still hit.
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+Embedder = Callable[[str], Sequence[float]]
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def hash_content(content: Union[str, bytes]) -> str:
+    """
+    Hash chunk content for use as an exact-match cache key.
+
+    Keys only need collision resistance, not cryptographic strength, so
+    this uses 128-bit xxh3 when xxhash is installed. The SHA-256 fallback
+    is the fastest hashlib option on CPUs with SHA extensions.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(content)
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_default_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL) -> Embedder:
+    """Load a small local sentence-transformers model as an embedder."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "Semantic matching requires sentence-transformers: "
+            "pip install sentence-transformers"
+        ) from e
+
+    model = SentenceTransformer(model_name)
+    return lambda text: model.encode(text).tolist()
+
+
+def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SemanticResultCache:
+    """
+    SQLite-backed cache of sub-agent responses.
+
+    Without an embedder only identical task descriptions match. Pass
+    embedder=load_default_embedder() to also accept descriptions whose
+    embedding similarity is at least `threshold`.
+    """
+
+    def __init__(self,
+                 path: Union[str, Path] = ":memory:",
+                 threshold: float = 0.95,
+                 embedder: Optional[Embedder] = None):
+        self.threshold = threshold
+        self.embedder = embedder
+        self._embeddings: Dict[str, List[float]] = {}
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                chunk_hash TEXT NOT NULL,
+                task_description TEXT NOT NULL,
+                embedding TEXT,
+                response TEXT NOT NULL,
+                PRIMARY KEY (chunk_hash, task_description)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, chunk_hash: str, task_description: str) -> Optional[str]:
+        """Return a cached response for this chunk and task, if any."""
+        row = self._conn.execute(
+            "SELECT response FROM results WHERE chunk_hash = ? AND task_description = ?",
+            (chunk_hash, task_description)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        if self.embedder is None:
+            return None
+
+        query = self._embed(task_description)
+        best_score, best_response = self.threshold, None
+        for embedding, response in self._conn.execute(
+            "SELECT embedding, response FROM results "
+            "WHERE chunk_hash = ? AND embedding IS NOT NULL",
+            (chunk_hash,)
+        ):
+            score = _cosine_similarity(query, json.loads(embedding))
+            if score >= best_score:
+                best_score, best_response = score, response
+        return best_response
+
+    def put(self, chunk_hash: str, task_description: str, response: str):
+        """Store a sub-agent response for this chunk and task."""
+        embedding = None
+        if self.embedder is not None:
+            embedding = json.dumps(self._embed(task_description))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (chunk_hash, task_description, embedding, response)
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def _embed(self, text: str) -> List[float]:
+        # The same task description is looked up once per chunk
+        if text not in self._embeddings:
+            self._embeddings[text] = [float(x) for x in self.embedder(text)]
+        return self._embeddings[text]
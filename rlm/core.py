@@ -3,25 +3,167 @@ Core RLM functionality: context management, chunking, and state.
 """
 
 import re
+import os
 import json
+import mmap
+import stat
+import itertools
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Callable
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, Optional, Callable, Tuple, Union
 from pathlib import Path
 
+try:
+    import re2  # google-re2: linear-time matching, opt-in via backend="re2"
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False  # Unsupported patterns fall back to re quietly
+except ImportError:
+    re2 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Patterns used on the metadata/chunking path, compiled once per process
+_HEADER_RE = re.compile(r'^#{1,6}\s+.+$', re.MULTILINE)
+_PARA_SPLIT_RE = re.compile(r'\n\s*\n')
+_WORD_RE = re.compile(r'\S+')
+
 
-@dataclass
 class ChunkInfo:
-    """Information about a document chunk."""
-    index: int
-    start_char: int
-    end_char: int
-    content: str
-    token_estimate: int  # Rough estimate: ~4 chars per token
+    """
+    Information about a document chunk.
+
+    Chunks cut from a document only keep a reference to it; their content
+    is sliced from the source when read rather than stored per chunk.
+    """
+
+    __slots__ = ("index", "start_char", "end_char", "token_estimate", "_content", "_source")
+
+    def __init__(self,
+                 index: int,
+                 start_char: int,
+                 end_char: int,
+                 content: Optional[str] = None,
+                 token_estimate: Optional[int] = None,
+                 *,
+                 source: Optional[str] = None):
+        if content is None and source is None:
+            raise TypeError("ChunkInfo requires content or a source document")
+        self.index = index
+        self.start_char = start_char
+        self.end_char = end_char
+        if token_estimate is None:
+            # Rough estimate: ~4 chars per token
+            token_estimate = (len(content) if content is not None else end_char - start_char) // 4
+        self.token_estimate = token_estimate
+        self._content = content
+        self._source = source
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"ChunkInfo(index={self.index}, start_char={self.start_char}, "
+                f"end_char={self.end_char}, token_estimate={self.token_estimate})")
+
+    def __eq__(self, other):
+        if not isinstance(other, ChunkInfo):
+            return NotImplemented
+        if ((self.index, self.start_char, self.end_char, self.token_estimate)
+                != (other.index, other.start_char, other.end_char, other.token_estimate)):
+            return False
+        if self._source is not None and self._source is other._source:
+            return True  # Same slice of the same document
+        return self.content == other.content
+
+    @property
+    def content(self) -> str:
+        """The chunk text."""
+        if self._content is not None:
+            return self._content
+        return self._source[self.start_char:self.end_char]
+
+    @property
+    def content_bytes(self) -> bytes:
+        """UTF-8 encoded content (encoded on each access, not kept)."""
+        return self.content.encode('utf-8')
+
+    @property
+    def bytes_len(self) -> int:
+        """Size of the content in UTF-8 bytes."""
+        content = self.content
+        return len(content) if content.isascii() else len(content.encode('utf-8'))
 
     @property
     def preview(self) -> str:
         """First 100 chars of chunk."""
-        return self.content[:100] + "..." if len(self.content) > 100 else self.content
+        head = self.head(100)
+        return head + "..." if self.end_char - self.start_char > 100 else head
+
+    def head(self, n: int) -> str:
+        """First n chars of the chunk, without slicing out the rest of it."""
+        if self._content is not None:
+            return self._content[:n]
+        return self._source[self.start_char:min(self.end_char, self.start_char + n)]
+
+
+class ChunkTable(Sequence):
+    """
+    Chunks stored as columns of offsets into a shared document.
+
+    Only start/end/token-estimate columns are kept per chunk; a ChunkInfo
+    view over the document is built when a chunk is accessed. Behaves
+    like a read-only list of ChunkInfo.
+    """
+
+    def __init__(self, document: str):
+        self.document = document
+        self.starts = array('q')
+        self.ends = array('q')
+        self.token_estimates = array('q')
+
+    def append(self, start: int, end: int):
+        """Add the chunk document[start:end]."""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.token_estimates.append((end - start) // 4)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("chunk index out of range")
+        return ChunkInfo(
+            index=i,
+            start_char=self.starts[i],
+            end_char=self.ends[i],
+            token_estimate=self.token_estimates[i],
+            source=self.document
+        )
+
+    def __repr__(self) -> str:
+        return f"ChunkTable({len(self)} chunks)"
+
+    def indices_by_tokens(self, min_tokens: int = 0, max_tokens: Optional[int] = None) -> List[int]:
+        """Indices of chunks whose token estimate lies in [min_tokens, max_tokens]."""
+        if np is not None:
+            estimates = np.frombuffer(self.token_estimates, dtype=np.int64)
+            mask = estimates >= min_tokens
+            if max_tokens is not None:
+                mask &= estimates <= max_tokens
+            return np.flatnonzero(mask).tolist()
+        return [
+            i for i, t in enumerate(self.token_estimates)
+            if t >= min_tokens and (max_tokens is None or t <= max_tokens)
+        ]
 
 
 @dataclass
@@ -33,26 +175,116 @@ class RLMContext:
     programmatic access methods.
     """
     document: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
     buffer: Dict[str, Any] = field(default_factory=dict)  # For accumulating results
-    chunks: List[ChunkInfo] = field(default_factory=list)
+    chunks: Sequence[ChunkInfo] = field(default_factory=list)
     sub_call_results: List[Dict[str, Any]] = field(default_factory=list)
 
-    def __post_init__(self):
-        self.metadata = create_metadata(self.document)
-
-    def search(self, pattern: str, flags: int = 0) -> List[Dict[str, Any]]:
-        """Search document with regex, return matches with positions."""
-        matches = []
-        for m in re.finditer(pattern, self.document, flags):
-            matches.append({
-                "match": m.group(),
-                "start": m.start(),
-                "end": m.end(),
-                "groups": m.groups(),
-                "context": self.document[max(0, m.start()-50):m.end()+50]
-            })
-        return matches
+    @cached_property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Document metadata (see create_metadata).
+
+        Computed on first access rather than when the context is created.
+        Every field is also a property of its own; char_count and
+        token_estimate cost nothing, and the fields that need a pass over
+        the document are cached, so each can be read without the others.
+        """
+        return {
+            "char_count": self.char_count,
+            "token_estimate": self.token_estimate,
+            "line_count": self.line_count,
+            "word_count": self.word_count,
+            "header_count": self.header_count,
+            "headers_preview": self.headers_preview,
+            "first_500_chars": self.first_500_chars,
+            "last_500_chars": self.last_500_chars,
+        }
+
+    @property
+    def char_count(self) -> int:
+        return len(self.document)
+
+    @property
+    def token_estimate(self) -> int:
+        return len(self.document) // 4  # Rough estimate
+
+    @cached_property
+    def line_count(self) -> int:
+        return self.document.count('\n') + 1
+
+    @cached_property
+    def word_count(self) -> int:
+        return _count_words(self.document)
+
+    @cached_property
+    def _header_stats(self) -> Tuple[int, List[str]]:
+        return _scan_headers(self.document)
+
+    @cached_property
+    def header_count(self) -> int:
+        return self._header_stats[0]
+
+    @cached_property
+    def headers_preview(self) -> List[str]:
+        return self._header_stats[1]
+
+    @cached_property
+    def first_500_chars(self) -> str:
+        return self.document[:500]
+
+    @cached_property
+    def last_500_chars(self) -> str:
+        return self.document[-500:] if len(self.document) > 500 else self.document
+
+    @classmethod
+    def from_file(cls,
+                  path: Union[str, Path],
+                  encoding: str = "utf-8",
+                  newline: Optional[str] = None) -> "RLMContext":
+        """
+        Load a document from disk via mmap.
+
+        The text is decoded straight from the mapped pages, so no intermediate
+        bytes copy of the file is held next to the decoded document. Files
+        that cannot be mapped (empty files, pipes, procfs entries) are read
+        normally. As with text-mode open(), newline=None translates \\r\\n
+        and \\r to \\n; any other value keeps line endings as stored.
+        """
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if stat.S_ISREG(st.st_mode) and st.st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    document = str(mm, encoding)
+            else:
+                # Special files report a size of 0 however much they hold
+                document = f.read().decode(encoding)
+        if newline is None and '\r' in document:
+            document = document.replace('\r\n', '\n').replace('\r', '\n')
+        return cls(document)
+
+    def search(self,
+               pattern: str,
+               flags: int = 0,
+               backend: str = "re") -> List[Dict[str, Any]]:
+        """
+        Search document with regex, return matches with positions.
+
+        backend="re2" matches in linear time (see _compile_pattern for how
+        its results can differ from the default `re` backend).
+        """
+        return [
+            self._match_to_dict(m)
+            for m in _compile_pattern(pattern, flags, backend).finditer(self.document)
+        ]
+
+    def _match_to_dict(self, m) -> Dict[str, Any]:
+        return {
+            "match": m.group(),
+            "start": m.start(),
+            "end": m.end(),
+            "groups": m.groups(),
+            "context": self.document[max(0, m.start()-50):m.end()+50]
+        }
 
     def get_section(self, start: int, end: int) -> str:
         """Extract a section of the document by character positions."""
@@ -61,7 +293,7 @@ class RLMContext:
     def chunk(self,
               chunk_size: int = 50000,
               overlap: int = 500,
-              strategy: str = "uniform") -> List[ChunkInfo]:
+              strategy: str = "uniform") -> ChunkTable:
         """
         Chunk the document using specified strategy.
 
@@ -85,6 +317,17 @@ class RLMContext:
         """Filter chunks based on a predicate function."""
         return [c for c in self.chunks if predicate(c)]
 
+    def filter_chunks_by_tokens(self,
+                                min_tokens: int = 0,
+                                max_tokens: Optional[int] = None) -> List[ChunkInfo]:
+        """Filter chunks by token estimate, vectorized when numpy is available."""
+        if isinstance(self.chunks, ChunkTable):
+            return [self.chunks[i] for i in self.chunks.indices_by_tokens(min_tokens, max_tokens)]
+        return self.filter_chunks(
+            lambda c: c.token_estimate >= min_tokens
+            and (max_tokens is None or c.token_estimate <= max_tokens)
+        )
+
     def store_result(self, key: str, value: Any):
         """Store a result in the buffer for later aggregation."""
         self.buffer[key] = value
@@ -106,7 +349,7 @@ class RLMContext:
     def get_state_summary(self) -> str:
         """Get a summary of current RLM state for the model."""
         return f"""RLM State Summary:
-- Document length: {self.metadata['char_count']:,} chars (~{self.metadata['token_estimate']:,} tokens)
+- Document length: {self.char_count:,} chars (~{self.token_estimate:,} tokens)
 - Chunks created: {len(self.chunks)}
 - Sub-calls made: {len(self.sub_call_results)}
 - Buffer keys: {list(self.buffer.keys())}
@@ -122,30 +365,95 @@ class RLMContext:
         }
 
 
+@lru_cache(maxsize=128)
+def _compile_pattern(pattern: str, flags: int = 0, backend: str = "re"):
+    """
+    Compile a search pattern with the given regex backend ("re" or "re2").
+
+    RE2 cannot backtrack catastrophically, but its \\w, \\s, \\d and \\b are
+    ASCII-only, $ does not match before a trailing newline, and offsets are
+    mapped back from UTF-8, which makes it slower on plain scans. It has no
+    flag argument and rejects backreferences/lookaround, so those cases
+    fall back to Python's `re`.
+    """
+    if backend == "re2":
+        if re2 is None:
+            raise ImportError("The re2 backend requires google-re2: pip install google-re2")
+        if not flags:
+            try:
+                return re2.compile(pattern, _RE2_OPTIONS)
+            except re2.error:
+                pass
+    elif backend != "re":
+        raise ValueError(f"Unknown regex backend: {backend}")
+    return re.compile(pattern, flags)
+
+
+def _iter_headers(document: str):
+    """
+    Yield markdown header matches, the same as _HEADER_RE.finditer(document).
+
+    A header can only start with '#' at the start of a line, so the regex is
+    only tried at those positions (found with str.find) rather than being
+    advanced over every character of the document.
+    """
+    last_end = 0
+    for pos in _hash_line_starts(document):
+        if pos < last_end:
+            continue  # Inside the previous header, whose \s+ may span lines
+        m = _HEADER_RE.match(document, pos)
+        if m:
+            last_end = m.end()
+            yield m
+
+
+def _hash_line_starts(document: str):
+    """Yield the offset of every line that starts with '#'."""
+    if document.startswith('#'):
+        yield 0
+    pos = document.find('\n#')
+    while pos != -1:
+        yield pos + 1
+        pos = document.find('\n#', pos + 1)
+
+
 def create_metadata(document: str) -> Dict[str, Any]:
     """Create metadata about a document for the RLM context."""
-    lines = document.split('\n')
-
-    # Detect document structure
-    headers = re.findall(r'^#{1,6}\s+.+$', document, re.MULTILINE)
+    header_count, headers_preview = _scan_headers(document)
 
     return {
         "char_count": len(document),
         "token_estimate": len(document) // 4,  # Rough estimate
-        "line_count": len(lines),
-        "word_count": len(document.split()),
-        "header_count": len(headers),
-        "headers_preview": headers[:10],  # First 10 headers
+        "line_count": document.count('\n') + 1,
+        "word_count": _count_words(document),
+        "header_count": header_count,
+        "headers_preview": headers_preview,
         "first_500_chars": document[:500],
         "last_500_chars": document[-500:] if len(document) > 500 else document,
     }
 
 
+def _scan_headers(document: str) -> Tuple[int, List[str]]:
+    """Count markdown headers, keeping only the first 10 for a preview."""
+    headers_preview = []
+    header_count = 0
+    for m in _iter_headers(document):
+        if header_count < 10:
+            headers_preview.append(m.group())
+        header_count += 1
+    return header_count, headers_preview
+
+
+def _count_words(document: str) -> int:
+    """Count whitespace-separated words without building a list of them."""
+    return sum(1 for _ in _WORD_RE.finditer(document))
+
+
 def chunk_document(
     document: str,
     chunk_size: int = 50000,
     overlap: int = 500
-) -> List[ChunkInfo]:
+) -> ChunkTable:
     """
     Split document into overlapping chunks.
 
@@ -155,11 +463,16 @@ def chunk_document(
         overlap: Overlap between chunks to maintain context
 
     Returns:
-        List of ChunkInfo objects
+        ChunkTable of the chunks (a read-only sequence of ChunkInfo)
     """
-    chunks = []
+    chunks = ChunkTable(document)
+    if len(document) <= chunk_size:
+        # Fits in one chunk: no boundary search needed
+        if document:
+            chunks.append(0, len(document))
+        return chunks
+
     start = 0
-    index = 0
 
     while start < len(document):
         end = min(start + chunk_size, len(document))
@@ -176,98 +489,73 @@ def chunk_document(
                 if period_pos > start:
                     end = period_pos + 2
 
-        chunk_content = document[start:end]
-        chunks.append(ChunkInfo(
-            index=index,
-            start_char=start,
-            end_char=end,
-            content=chunk_content,
-            token_estimate=len(chunk_content) // 4
-        ))
-
-        index += 1
+        chunks.append(start, end)
         start = end - overlap if end < len(document) else end
 
     return chunks
 
 
-def chunk_by_paragraphs(document: str, max_chunk_size: int = 50000) -> List[ChunkInfo]:
-    """Chunk by paragraph boundaries, respecting max size."""
-    paragraphs = re.split(r'\n\s*\n', document)
-    chunks = []
-    current_chunk = ""
+def chunk_by_paragraphs(document: str, max_chunk_size: int = 50000) -> ChunkTable:
+    """
+    Chunk by paragraph boundaries, respecting max size.
+
+    Each chunk ends after the blank-line separator of its last paragraph,
+    so chunks are contiguous slices of the document.
+    """
+    chunks = ChunkTable(document)
+    if len(document) <= max_chunk_size:
+        # Fits in one chunk: no need to split into paragraphs
+        if document and not document.isspace():
+            chunks.append(0, len(document))
+        return chunks
+
     current_start = 0
-    index = 0
-
-    for para in paragraphs:
-        if len(current_chunk) + len(para) > max_chunk_size and current_chunk:
-            chunks.append(ChunkInfo(
-                index=index,
-                start_char=current_start,
-                end_char=current_start + len(current_chunk),
-                content=current_chunk,
-                token_estimate=len(current_chunk) // 4
-            ))
-            index += 1
-            current_start = current_start + len(current_chunk)
-            current_chunk = para + "\n\n"
-        else:
-            current_chunk += para + "\n\n"
+    current_end = 0  # End of the last paragraph (and separator) in the chunk
 
-    if current_chunk.strip():
-        chunks.append(ChunkInfo(
-            index=index,
-            start_char=current_start,
-            end_char=current_start + len(current_chunk),
-            content=current_chunk,
-            token_estimate=len(current_chunk) // 4
-        ))
+    separators = itertools.chain(_PARA_SPLIT_RE.finditer(document), [None])
+    for sep in separators:
+        para_end = sep.start() if sep else len(document)
+        if para_end - current_start > max_chunk_size and current_end > current_start:
+            chunks.append(current_start, current_end)
+            current_start = current_end
+        current_end = sep.end() if sep else len(document)
+
+    if document[current_start:current_end].strip():
+        chunks.append(current_start, current_end)
 
     return chunks
 
 
-def chunk_by_headers(document: str, max_chunk_size: int = 50000) -> List[ChunkInfo]:
+def chunk_by_headers(document: str, max_chunk_size: int = 50000) -> ChunkTable:
     """Chunk by markdown headers, respecting max size."""
-    # Split on headers while keeping the header with its content
-    sections = re.split(r'(^#{1,6}\s+.+$)', document, flags=re.MULTILINE)
-
-    chunks = []
-    current_chunk = ""
+    # Each section runs from a header to the next one; any text before the
+    # first header is a section of its own. Boundaries are streamed from the
+    # header scan, so memory stays constant in the number of headers.
+    chunks = ChunkTable(document)
+    if len(document) <= max_chunk_size:
+        # Fits in one chunk: no need to look for headers
+        if document and not document.isspace():
+            chunks.append(0, len(document))
+        return chunks
+
+    header_starts = (m.start() for m in _iter_headers(document))
+    current_len = 0
     current_start = 0
-    index = 0
-
-    i = 0
-    while i < len(sections):
-        section = sections[i]
-        # If this is a header, combine with next section
-        if re.match(r'^#{1,6}\s+', section) and i + 1 < len(sections):
-            section = section + sections[i + 1]
-            i += 2
-        else:
-            i += 1
-
-        if len(current_chunk) + len(section) > max_chunk_size and current_chunk:
-            chunks.append(ChunkInfo(
-                index=index,
-                start_char=current_start,
-                end_char=current_start + len(current_chunk),
-                content=current_chunk,
-                token_estimate=len(current_chunk) // 4
-            ))
-            index += 1
-            current_start = current_start + len(current_chunk)
-            current_chunk = section
+    section_start = 0
+
+    for section_end in itertools.chain(header_starts, [len(document)]):
+        section_len = section_end - section_start
+        section_start = section_end
+
+        if current_len + section_len > max_chunk_size and current_len:
+            chunks.append(current_start, current_start + current_len)
+            current_start += current_len
+            current_len = section_len
         else:
-            current_chunk += section
-
-    if current_chunk.strip():
-        chunks.append(ChunkInfo(
-            index=index,
-            start_char=current_start,
-            end_char=current_start + len(current_chunk),
-            content=current_chunk,
-            token_estimate=len(current_chunk) // 4
-        ))
+            current_len += section_len
+
+    if document[current_start:current_start + current_len].strip():
+        chunks.append(current_start, current_start + current_len)
 
     return chunks
 
@@ -10,13 +10,27 @@ Usage in Claude Code:
 3. Aggregate results in main context
 """
 
+import asyncio
+import io
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+from dataclasses import dataclass, field
+from .cache import SemanticResultCache, hash_content
 from .core import RLMContext, ChunkInfo
 from .prompts import format_sub_agent_prompt, format_aggregation_prompt
 
 
+def _found_in_chunk(result: str) -> bool:
+    """Default wait_first acceptance test: the sub-agent found something."""
+    return "NOT_FOUND_IN_CHUNK" not in result
+
+
+def _check_max_parallel(max_parallel: int):
+    # asyncio.Semaphore(0) would never let a task start
+    if max_parallel < 1:
+        raise ValueError(f"max_parallel must be at least 1, got {max_parallel}")
+
+
 @dataclass
 class SubAgentTask:
     """Represents a task to be executed by a sub-agent via Task tool."""
@@ -24,18 +38,43 @@ class SubAgentTask:
     task_description: str
     agent_type: str = "sisyphus-junior"
     run_in_background: bool = True
-
-    def to_task_params(self, ctx: RLMContext) -> Dict[str, Any]:
-        """Generate parameters for Claude Code's Task tool."""
-        prompt = format_sub_agent_prompt(
+    # (key, prompt) of the last formatted prompt; see _get_or_build_prompt
+    _prompt_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def _get_or_build_prompt(self, ctx: RLMContext) -> str:
+        """Format the sub-agent prompt, reusing it while its inputs are unchanged."""
+        # Chunk content is immutable once created, so the prompt only changes
+        # if the task is edited or it is formatted against another chunking
+        key = (ctx, self.chunk, len(ctx.chunks), self.task_description)
+        if self._prompt_cache is None or self._prompt_cache[0] != key:
+            self._prompt_cache = (key, self._format_prompt(ctx))
+        return self._prompt_cache[1]
+
+    def _prompt_preview(self, ctx: RLMContext, limit: int) -> str:
+        """First `limit` chars of the prompt, without formatting the whole chunk."""
+        if self._prompt_cache is not None:
+            return self._get_or_build_prompt(ctx)[:limit]
+        # The chunk text can contribute at most `limit` chars to the preview
+        return self._format_prompt(ctx, self.chunk.head(limit))[:limit]
+
+    def _format_prompt(self, ctx: RLMContext, chunk_content: Optional[str] = None) -> str:
+        """Format the sub-agent prompt without caching it."""
+        return format_sub_agent_prompt(
             task_description=self.task_description,
             chunk_index=self.chunk.index,
             total_chunks=len(ctx.chunks),
             start_char=self.chunk.start_char,
             end_char=self.chunk.end_char,
-            total_chars=ctx.metadata["char_count"],
-            chunk_content=self.chunk.content
+            total_chars=len(ctx.document),
+            chunk_content=self.chunk.content if chunk_content is None else chunk_content
         )
+
+    def to_task_params(self, ctx: RLMContext) -> Dict[str, Any]:
+        """Generate parameters for Claude Code's Task tool."""
+        return self._task_params(self._get_or_build_prompt(ctx))
+
+    def _task_params(self, prompt: str) -> Dict[str, Any]:
+        """Task tool parameters for an already formatted prompt."""
         return {
             "subagent_type": self.agent_type,
             "prompt": prompt,
@@ -44,6 +83,41 @@ class SubAgentTask:
         }
 
 
+class PromptArena:
+    """
+    Sub-agent prompts packed back to back in one UTF-8 buffer.
+
+    Each prompt is an (offset, length) entry into a single bytearray instead
+    of a separate string object, so a large batch is one allocation that a
+    dispatch loop can read sequentially.
+    """
+
+    def __init__(self):
+        self.arena = bytearray()
+        self.offsets: List[Tuple[int, int]] = []
+
+    def append(self, prompt: str) -> int:
+        """Add a prompt and return its index."""
+        data = prompt.encode("utf-8")
+        self.offsets.append((len(self.arena), len(data)))
+        self.arena += data
+        return len(self.offsets) - 1
+
+    def get_bytes(self, index: int) -> bytes:
+        """UTF-8 bytes of a prompt, ready to send."""
+        offset, length = self.offsets[index]
+        with memoryview(self.arena) as view:
+            return bytes(view[offset:offset + length])
+
+    def __getitem__(self, index: int) -> str:
+        offset, length = self.offsets[index]
+        with memoryview(self.arena) as view:
+            return str(view[offset:offset + length], "utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
 class RLMOrchestrator:
     """
     Orchestrates RLM-style processing using Claude Code's Task tool.
@@ -56,36 +130,169 @@ class RLMOrchestrator:
         self.ctx = ctx
         self.pending_tasks: List[SubAgentTask] = []
         self.completed_results: List[Dict[str, Any]] = []
+        self.cache: Optional[SemanticResultCache] = None
+        # Chunk index of each task -> indices of all chunks with identical content
+        self.dedup_map: Dict[int, List[int]] = {}
 
     def create_chunk_tasks(
         self,
         task_description: str,
         agent_type: str = "sisyphus-junior",
         parallel: bool = True,
-        chunk_filter: Optional[callable] = None
+        chunk_filter: Optional[callable] = None,
+        cache: Optional[SemanticResultCache] = None,
+        dedupe: bool = True
     ) -> List[SubAgentTask]:
         """
         Create sub-agent tasks for all chunks (or filtered chunks).
 
+        With dedupe, chunks whose content is identical share one task and
+        record_result fans its response out to all of them (see dedup_map).
+        With a cache, chunks that already have a response for this task are
+        not turned into tasks; the cached response goes straight into
+        completed_results.
+
         Returns list of SubAgentTask objects that can be converted to Task tool calls.
         """
         chunks = self.ctx.chunks
         if chunk_filter:
             chunks = [c for c in chunks if chunk_filter(c)]
 
-        tasks = [
-            SubAgentTask(
+        self.cache = cache
+        self.completed_results = []
+        self.dedup_map = {}
+        seen: Dict[str, SubAgentTask] = {}
+        tasks = []
+        for chunk in chunks:
+            content_hash = hash_content(chunk.content) if (dedupe or cache is not None) else None
+            if content_hash in seen:
+                self.dedup_map[seen[content_hash].chunk.index].append(chunk.index)
+                continue
+            if cache is not None:
+                hit = cache.get(content_hash, task_description)
+                if hit is not None:
+                    self.completed_results.append({
+                        "chunk_index": chunk.index,
+                        "result": hit,
+                        "cached": True
+                    })
+                    continue
+            task = SubAgentTask(
                 chunk=chunk,
                 task_description=task_description,
                 agent_type=agent_type,
                 run_in_background=parallel
             )
-            for chunk in chunks
-        ]
+            tasks.append(task)
+            self.dedup_map[chunk.index] = [chunk.index]
+            if dedupe:
+                seen[content_hash] = task
 
         self.pending_tasks = tasks
         return tasks
 
+    def record_result(self, task: SubAgentTask, result: str):
+        """
+        Record a sub-agent response, storing it in the cache if one is set.
+
+        The response is recorded for every chunk that shares the task's content.
+        """
+        for chunk_index in self.dedup_map.get(task.chunk.index, [task.chunk.index]):
+            self.completed_results.append({
+                "chunk_index": chunk_index,
+                "result": result,
+                "cached": False
+            })
+        self.ctx.record_sub_call(task.chunk.index, task.task_description, result)
+        if self.cache is not None:
+            self.cache.put(hash_content(task.chunk.content), task.task_description, result)
+
+    def materialize_prompts(self) -> PromptArena:
+        """
+        Format the prompts of all pending tasks into a PromptArena.
+
+        Entry i is the prompt for pending_tasks[i]. Prompts are formatted
+        one at a time and packed immediately, so they are not also kept as
+        per-task strings.
+        """
+        arena = PromptArena()
+        for task in self.pending_tasks:
+            arena.append(task._format_prompt(self.ctx))
+        return arena
+
+    async def execute_parallel(
+        self,
+        executor: Callable[[Dict[str, Any]], Awaitable[str]],
+        max_parallel: int = 8
+    ) -> List[str]:
+        """
+        Run all pending tasks through an async executor, at most max_parallel at once.
+
+        The executor receives each task's Task tool parameters and returns the
+        sub-agent response. Failures come back as "ERROR: ..." strings instead
+        of raising; successful responses are recorded with record_result.
+        Results are returned in pending_tasks order. Prompts are dispatched
+        from a PromptArena (see materialize_prompts), so only the prompts of
+        running tasks exist as strings.
+        """
+        _check_max_parallel(max_parallel)
+        arena = self.materialize_prompts()
+        sem = asyncio.Semaphore(max_parallel)
+
+        async def run_one(i: int, task: SubAgentTask):
+            async with sem:
+                try:
+                    return await executor(task._task_params(arena[i])), True
+                except Exception as e:
+                    return f"ERROR: {e}", False
+
+        outcomes = await asyncio.gather(
+            *(run_one(i, t) for i, t in enumerate(self.pending_tasks)))
+        for task, (result, ok) in zip(self.pending_tasks, outcomes):
+            if ok:
+                self.record_result(task, result)
+        return [result for result, _ in outcomes]
+
+    async def wait_first(
+        self,
+        executor: Callable[[Dict[str, Any]], Awaitable[str]],
+        max_parallel: int = 8,
+        accept: Callable[[str], bool] = _found_in_chunk
+    ) -> Optional[str]:
+        """
+        Run pending tasks until one returns an accepted response, then cancel the rest.
+
+        Suited to needle searches: by default the first response that is not
+        NOT_FOUND_IN_CHUNK wins. Returns None if no task produced an accepted
+        response; failed tasks are skipped. Prompts are dispatched from a
+        PromptArena, as in execute_parallel.
+        """
+        _check_max_parallel(max_parallel)
+        arena = self.materialize_prompts()
+        sem = asyncio.Semaphore(max_parallel)
+
+        async def run_one(i: int, task: SubAgentTask):
+            async with sem:
+                return task, await executor(task._task_params(arena[i]))
+
+        pending = {
+            asyncio.ensure_future(run_one(i, t)) for i, t in enumerate(self.pending_tasks)
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        continue
+                    task, result = future.result()
+                    self.record_result(task, result)
+                    if accept(result):
+                        return result
+            return None
+        finally:
+            for future in pending:
+                future.cancel()
+
     def generate_task_calls(self) -> str:
         """
         Generate the Task tool calls as instructions for Claude Code.
@@ -95,25 +302,36 @@ class RLMOrchestrator:
         if not self.pending_tasks:
             return "No tasks to execute. Create chunks first with ctx.chunk()"
 
-        instructions = ["# Execute these Task tool calls:\n"]
+        buf = io.StringIO()
+        buf.write("# Execute these Task tool calls:\n")
 
+        shared = False
         for task in self.pending_tasks:
-            params = task.to_task_params(self.ctx)
-            instructions.append(f"""
+            buf.write("\n")
+            covered = self.dedup_map.get(task.chunk.index, [task.chunk.index])
+            if len(covered) > 1:
+                shared = True
+                buf.write(f"\n# Also answers for chunks {covered[1:]} (identical content)")
+            buf.write(f"""
 Task(
-    subagent_type="{params['subagent_type']}",
-    description="{params['description']}",
-    run_in_background={params['run_in_background']},
-    prompt=\"\"\"{params['prompt'][:500]}...\"\"\"  # Truncated for display
+    subagent_type="{task.agent_type}",
+    description="RLM chunk {task.chunk.index}",
+    run_in_background={task.run_in_background},
+    prompt=\"\"\"{task._prompt_preview(self.ctx, 500)}...\"\"\"  # Truncated for display
 )
 """)
 
+        if shared:
+            buf.write(
+                "\n\n# NOTE: Some chunks share a task. When aggregating, count each such "
+                "response once for every chunk it answers for"
+            )
         if len(self.pending_tasks) > 1:
-            instructions.append(
-                "\n# NOTE: Call all Task tools in a SINGLE message for parallel execution"
+            buf.write(
+                "\n\n# NOTE: Call all Task tools in a SINGLE message for parallel execution"
             )
 
-        return "\n".join(instructions)
+        return buf.getvalue()
 
     def create_aggregation_prompt(
         self,
@@ -144,12 +362,8 @@ def create_rlm_workflow(
 ```python
 from rlm import RLMContext
 
-# Load the document
-with open("{document_path}", "r") as f:
-    document = f.read()
-
-# Create RLM context
-ctx = RLMContext(document)
+# Load the document (memory-mapped, decoded once)
+ctx = RLMContext.from_file("{document_path}")
 print(ctx.metadata)
 ```
 
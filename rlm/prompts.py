@@ -5,6 +5,8 @@ Based on the prompts described in the RLM paper (Appendix D),
 adapted for Claude Code's Task tool architecture.
 """
 
+import io
+
 RLM_SYSTEM_PROMPT = """
 # Recursive Language Model (RLM) Mode
 
@@ -130,7 +132,7 @@ EVIDENCE: [Brief quote or reference from the chunk if applicable]
 """
 
 
-AGGREGATION_PROMPT = """
+AGGREGATION_PROMPT_HEADER = """
 # RLM Result Aggregation
 
 You have received responses from {num_responses} sub-agents, each processing a different chunk of the document.
@@ -139,7 +141,9 @@ You have received responses from {num_responses} sub-agents, each processing a d
 {original_query}
 
 ## Sub-Agent Responses
-{responses}
+"""
+
+AGGREGATION_PROMPT_FOOTER = """
 
 ## Your Task
 1. Analyze all sub-agent responses
@@ -153,6 +157,8 @@ CONFIDENCE: [Overall confidence]
 COVERAGE: [What % of the query was answerable]
 """
 
+AGGREGATION_PROMPT = AGGREGATION_PROMPT_HEADER + "{responses}" + AGGREGATION_PROMPT_FOOTER
+
 
 def format_sub_agent_prompt(
     task_description: str,
@@ -180,12 +186,17 @@ def format_aggregation_prompt(
     responses: list
 ) -> str:
     """Format the aggregation prompt with all sub-agent responses."""
-    formatted_responses = "\n\n".join([
-        f"### Chunk {i+1} Response:\n{resp}"
-        for i, resp in enumerate(responses)
-    ])
-    return AGGREGATION_PROMPT.format(
+    # Responses are written straight into the buffer rather than joined and
+    # then substituted, which would copy the combined text twice
+    buf = io.StringIO()
+    buf.write(AGGREGATION_PROMPT_HEADER.format(
         num_responses=len(responses),
-        original_query=original_query,
-        responses=formatted_responses
-    )
+        original_query=original_query
+    ))
+    for i, resp in enumerate(responses):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"### Chunk {i+1} Response:\n")
+        buf.write(resp)
+    buf.write(AGGREGATION_PROMPT_FOOTER)
+    return buf.getvalue()
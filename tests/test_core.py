@@ -0,0 +1,131 @@
+"""
+Tests for rlm.core.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from rlm import core
+from rlm.core import ChunkTable, RLMContext, create_metadata
+
+
+class SearchTest(unittest.TestCase):
+
+    DOCUMENT = "h\u00e9llo w\u00f6rld\nfoo\n"
+
+    def test_default_backend_is_unicode_aware(self):
+        ctx = RLMContext(self.DOCUMENT)
+        self.assertEqual(
+            [m["match"] for m in ctx.search(r"\w+")],
+            ["h\u00e9llo", "w\u00f6rld", "foo"])
+        self.assertEqual([m["match"] for m in ctx.search(r"foo$")], ["foo"])
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RLMContext(self.DOCUMENT).search("foo", backend="pcre")
+
+    @unittest.skipIf(core.re2 is None, "google-re2 not installed")
+    def test_re2_backend_positions_are_str_offsets(self):
+        ctx = RLMContext(self.DOCUMENT)
+        for m in ctx.search(r"w\S+|foo", backend="re2"):
+            self.assertEqual(self.DOCUMENT[m["start"]:m["end"]], m["match"])
+
+
+class MetadataTest(unittest.TestCase):
+
+    DOCUMENT = "# Title\n\nSome text here.\n\n## Section\nMore text.\n" * 50
+
+    def test_metadata_is_a_plain_dict(self):
+        ctx = RLMContext(self.DOCUMENT)
+        self.assertIsInstance(ctx.metadata, dict)
+        self.assertEqual(ctx.metadata, create_metadata(self.DOCUMENT))
+        self.assertEqual(json.loads(json.dumps(ctx.to_dict()))["metadata"], ctx.metadata)
+
+    def test_fields_are_computed_only_when_read(self):
+        ctx = RLMContext(self.DOCUMENT)
+        self.assertEqual(ctx.char_count, len(self.DOCUMENT))
+        self.assertEqual(ctx.token_estimate, len(self.DOCUMENT) // 4)
+        self.assertEqual(ctx.header_count, 100)
+        # Neither the size fields nor header_count built the full metadata
+        self.assertNotIn("metadata", vars(ctx))
+        self.assertNotIn("word_count", vars(ctx))
+
+
+class ChunkTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.document = "abcdefghij" * 10
+        self.table = ChunkTable(self.document)
+        for start, end in [(0, 10), (5, 45), (40, 100)]:
+            self.table.append(start, end)
+
+    def test_indexing_matches_a_list(self):
+        self.assertEqual(len(self.table), 3)
+        last = self.table[-1]
+        self.assertEqual((last.index, last.start_char, last.end_char), (2, 40, 100))
+        self.assertEqual(last.content, self.document[40:100])
+        self.assertEqual(last.token_estimate, 15)
+        for i in (3, -4, 100):
+            with self.assertRaises(IndexError):
+                self.table[i]
+
+    def test_slicing_and_iteration(self):
+        self.assertEqual([c.index for c in self.table[1:]], [1, 2])
+        self.assertEqual([c.index for c in self.table[::-2]], [2, 0])
+        self.assertEqual(self.table[5:], [])
+        self.assertEqual(list(self.table), self.table[:])
+        self.assertEqual([c.content for c in self.table],
+                         [self.document[0:10], self.document[5:45], self.document[40:100]])
+
+    def test_indices_by_tokens(self):
+        # Token estimates are 2, 10 and 15
+        self.assertEqual(self.table.indices_by_tokens(), [0, 1, 2])
+        self.assertEqual(self.table.indices_by_tokens(min_tokens=10), [1, 2])
+        self.assertEqual(self.table.indices_by_tokens(max_tokens=10), [0, 1])
+        self.assertEqual(self.table.indices_by_tokens(3, 9), [])
+
+
+class FromFileTest(unittest.TestCase):
+    """from_file must read the same text as text-mode open().read()."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, data: bytes) -> str:
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_regular_file_is_read_like_open(self):
+        for data in [b"a\r\nb\rc\n", "h\u00e9llo\r\n# T\u00eftle\n".encode(), b"", b"\r"]:
+            path = self.write("doc.txt", data)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(RLMContext.from_file(path).document, f.read())
+            with open(path, encoding="utf-8", newline="") as f:
+                self.assertEqual(RLMContext.from_file(path, newline="").document, f.read())
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs os.mkfifo")
+    def test_fifo_is_read_in_full(self):
+        # A FIFO reports st_size == 0 however much data is written to it
+        path = os.path.join(self.tmpdir.name, "fifo")
+        os.mkfifo(path)
+
+        def feed():
+            with open(path, "wb") as f:
+                f.write(b"hello\r\nworld\n")
+
+        writer = threading.Thread(target=feed)
+        writer.start()
+        try:
+            self.assertEqual(RLMContext.from_file(path).document, "hello\nworld\n")
+        finally:
+            writer.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests for rlm.orchestrator.
+"""
+
+import asyncio
+import unittest
+
+from rlm.core import RLMContext
+from rlm.orchestrator import RLMOrchestrator
+
+
+class DedupeTest(unittest.TestCase):
+
+    def setUp(self):
+        # Chunks 0, 1, 3 and 4 are identical; chunk 2 differs
+        lines = ["x" * 100, "x" * 100, "y" * 100, "x" * 100, "x" * 100]
+        self.ctx = RLMContext("".join(line + "\n" for line in lines))
+        self.ctx.chunk(chunk_size=101, overlap=0)
+        self.orch = RLMOrchestrator(self.ctx)
+
+    def test_identical_chunks_share_a_task(self):
+        tasks = self.orch.create_chunk_tasks("Count the x characters")
+        self.assertEqual([t.chunk.index for t in tasks], [0, 2])
+        self.assertEqual(self.orch.dedup_map, {0: [0, 1, 3, 4], 2: [2]})
+
+    def test_record_result_fans_out_to_every_covered_chunk(self):
+        tasks = self.orch.create_chunk_tasks("Count the x characters")
+        for task in tasks:
+            self.orch.record_result(task, f"result {task.chunk.index}")
+        self.assertEqual(
+            sorted((r["chunk_index"], r["result"]) for r in self.orch.completed_results),
+            [(0, "result 0"), (1, "result 0"), (2, "result 2"),
+             (3, "result 0"), (4, "result 0")])
+        # The sub-agent itself only ran once per task
+        self.assertEqual(len(self.ctx.sub_call_results), 2)
+
+    def test_task_calls_list_covered_chunks(self):
+        self.orch.create_chunk_tasks("Count the x characters")
+        calls = self.orch.generate_task_calls()
+        self.assertIn("# Also answers for chunks [1, 3, 4]", calls)
+        self.assertIn("count each such response once for every chunk", calls)
+
+    def test_without_dedupe_every_chunk_gets_a_task(self):
+        tasks = self.orch.create_chunk_tasks("Count the x characters", dedupe=False)
+        self.assertEqual(len(tasks), 5)
+        self.assertNotIn("Also answers for", self.orch.generate_task_calls())
+
+
+class AsyncExecutionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ctx = RLMContext("".join(f"line {i}\n" for i in range(2000)))
+        self.ctx.chunk(chunk_size=2000, overlap=50)
+        self.orch = RLMOrchestrator(self.ctx)
+        self.tasks = self.orch.create_chunk_tasks("Find line 1500")
+        self.expected = {
+            f"RLM chunk {t.chunk.index}": t._format_prompt(self.ctx) for t in self.tasks
+        }
+        self.sent = {}
+
+    async def executor(self, params):
+        self.sent[params["description"]] = params["prompt"]
+        return "ANSWER: line 1500" if "line 1500\n" in params["prompt"] else "NOT_FOUND_IN_CHUNK"
+
+    def test_execute_parallel_sends_full_prompts_without_keeping_them(self):
+        results = asyncio.run(self.orch.execute_parallel(self.executor, max_parallel=3))
+        self.assertEqual(len(results), len(self.tasks))
+        self.assertEqual(self.sent, self.expected)
+        self.assertEqual(len(self.orch.completed_results), len(self.tasks))
+        # Prompts came from the arena, not the per-task prompt cache
+        self.assertTrue(all(t._prompt_cache is None for t in self.tasks))
+
+    def test_wait_first_returns_accepted_response(self):
+        result = asyncio.run(self.orch.wait_first(self.executor))
+        self.assertEqual(result, "ANSWER: line 1500")
+        self.assertTrue(all(t._prompt_cache is None for t in self.tasks))
+
+    def test_max_parallel_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.orch.execute_parallel(self.executor, max_parallel=0))
+
+
+if __name__ == "__main__":
+    unittest.main()